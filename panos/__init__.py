@@ -314,9 +314,8 @@ def convert_if_int(string):
 
     """
     try:
-        integer = int(string)
-        return integer
-    except ValueError:
+        return int(string)
+    except (TypeError, ValueError):
         return string
 
 
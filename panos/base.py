@@ -2223,15 +2223,16 @@ class ParentAwareXpath(object):
         parent_settings = {}
         if parent is not None:
             parents = [parent.__class__.__name__, None]
-            parent_settings = parent._about_object()
+            # Only look at the parent's params if some profile keys off them.
+            if any(x is not None for x in self.parent_params):
+                parent_settings = parent._about_object()
 
         for p in parents:
             for parent_param in self.parent_params:
                 combo = (p, parent_param, parent_settings.get(parent_param, None))
-                try:
-                    return self.settings[combo]._get_versioned_value(panos_version)
-                except KeyError:
-                    pass
+                setting = self.settings.get(combo)
+                if setting is not None:
+                    return setting._get_versioned_value(panos_version)
 
         raise ValueError("No applicable combination found for xpath")
 
@@ -3433,13 +3434,8 @@ class PanDevice(PanObject):
         self._ha_active = True
         self.ha_failed = None
 
-        # Create a User-ID subsystem
-        self.userid = userid.UserId(self)
-        """User-ID subsystem
-
-        See Also: :class:`panos.userid`
-
-        """
+        # User-ID subsystem, created the first time it is used
+        self._userid = None
 
         # create a predefined object subsystem
         # avoid a premature import
@@ -3519,9 +3515,19 @@ class PanDevice(PanObject):
             err.PanSessionTimedOut,
         )
 
+        # Set once the PanXapi methods have been wrapped on this class.
+        _methods_wrapped = False
+
         def __init__(self, *args, **kwargs):
             self.pan_device = kwargs.pop("pan_device", None)
             pan.xapi.PanXapi.__init__(self, *args, **kwargs)
+            # The wrapper methods live on the class, so they only need to be
+            # created once rather than for every device's xapi.
+            if not PanDevice.XapiWrapper._methods_wrapped:
+                PanDevice.XapiWrapper._wrap_methods()
+
+        @classmethod
+        def _wrap_methods(cls):
             pred = lambda x: inspect.ismethod(x) or inspect.isfunction(
                 x
             )  # inspect.ismethod needed for Python2, inspect.isfunction needed for Python3
@@ -3544,9 +3550,14 @@ class PanDevice(PanObject):
                 # Create method matching each public method of the base class
                 setattr(PanDevice.XapiWrapper, name, wrapper_method)
 
+            PanDevice.XapiWrapper._methods_wrapped = True
+
         @classmethod
         def make_method(cls, super_method_name, super_method):
             def method(self, *args, **kwargs):
+                # Look up the PanXapi method on each call, since the wrappers
+                # are only made once and PanXapi may be patched after that.
+                super_method = getattr(pan.xapi.PanXapi, super_method_name)
                 retry_on_peer = kwargs.pop(
                     "retry_on_peer",
                     True
@@ -3748,6 +3759,21 @@ class PanDevice(PanObject):
             self._xapi_private = self.generate_xapi()
         return self._xapi_private
 
+    @property
+    def userid(self):
+        """User-ID subsystem
+
+        See Also: :class:`panos.userid`
+
+        """
+        if self._userid is None:
+            self._userid = userid.UserId(self)
+        return self._userid
+
+    @userid.setter
+    def userid(self, value):
+        self._userid = value
+
     def op(
         self,
         cmd=None,
@@ -4525,6 +4551,33 @@ class PanDevice(PanObject):
                 result:  OK or FAIL
                 messages: list of warnings or errors
 
+        """
+        jobid = self._commit_submit(
+            cmd=cmd,
+            exclude=exclude,
+            commit_all=commit_all,
+            exception=exception,
+            admins=admins,
+        )
+        if jobid is None:
+            return
+        if not sync:
+            # Don't synchronize, just return
+            self._logger.debug("Commit initiated (async), job id: %s" % (jobid,))
+            return jobid
+        else:
+            return self._commit_wait(jobid, sync_all=sync_all, exception=exception)
+
+    def _commit_submit(
+        self, cmd=None, exclude=None, commit_all=False, exception=False, admins=None
+    ):
+        """Internal use helper that starts a commit without waiting for it.
+
+        Parameters are the same as for ``_commit()``.
+
+        :return:
+            The job ID of the commit, or None if no commit is needed.
+
         """
         action = None
 
@@ -4560,8 +4613,7 @@ class PanDevice(PanObject):
 
         logger.debug(
             self.id
-            + ": commit requested: commit_all:%s sync:%s sync_all:%s cmd:%s"
-            % (str(commit_all), str(sync), str(sync_all), cmd,)
+            + ": commit requested: commit_all:%s cmd:%s" % (str(commit_all), cmd,)
         )
         if commit_all:
             action = "all"
@@ -4582,47 +4634,46 @@ class PanDevice(PanObject):
         self.commit_locked = False
         # Determine if a commit was needed and get the job id
         try:
-            jobid = commit_response.find("./result/job").text
+            return commit_response.find("./result/job").text
         except AttributeError:
             if exception:
                 raise err.PanCommitNotNeeded("Commit not needed", pan_device=self)
-            else:
-                return
-        if not sync:
-            # Don't synchronize, just return
-            self._logger.debug("Commit initiated (async), job id: %s" % (jobid,))
-            return jobid
-        else:
-            result = self.syncjob(commit_response, sync_all=sync_all)
 
-            if exception and not result["success"]:
+    def _commit_wait(self, jobid, sync_all=False, exception=False):
+        """Internal use helper that waits for a commit started by ``_commit_submit()``.
+
+        :return:
+            Result of commit as dict, see ``_commit()``.
+
+        """
+        result = self.syncjob(jobid, sync_all=sync_all)
+        return self._commit_result(result, exception)
+
+    def _commit_result(self, result, exception=False):
+        """Internal use helper that logs a finished commit's result.
+
+        Raises PanCommitFailed if the commit failed and exception is True,
+        otherwise returns the result.
+
+        """
+        if exception and not result["success"]:
+            self._logger.debug(
+                "Commit failed - device: %s, job: %s, messages: %s, warnings: %s"
+                % (self.id, result["jobid"], result["messages"], result["warnings"])
+            )
+            raise err.PanCommitFailed(pan_device=self, result=result)
+        else:
+            if result["success"]:
                 self._logger.debug(
-                    "Commit failed - device: %s, job: %s, messages: %s, warnings: %s"
+                    "Commit succeeded - device: %s, job: %s, messages: %s, warnings: %s"
                     % (self.id, result["jobid"], result["messages"], result["warnings"])
                 )
-                raise err.PanCommitFailed(pan_device=self, result=result)
             else:
-                if result["success"]:
-                    self._logger.debug(
-                        "Commit succeeded - device: %s, job: %s, messages: %s, warnings: %s"
-                        % (
-                            self.id,
-                            result["jobid"],
-                            result["messages"],
-                            result["warnings"],
-                        )
-                    )
-                else:
-                    self._logger.debug(
-                        "Commit failed - device: %s, job: %s, messages: %s, warnings: %s"
-                        % (
-                            self.id,
-                            result["jobid"],
-                            result["messages"],
-                            result["warnings"],
-                        )
-                    )
-                return result
+                self._logger.debug(
+                    "Commit failed - device: %s, job: %s, messages: %s, warnings: %s"
+                    % (self.id, result["jobid"], result["messages"], result["warnings"])
+                )
+            return result
 
     def syncjob(self, job_id, sync_all=False, interval=0.5):
         """Block until job completes and return result
@@ -4636,10 +4687,6 @@ class PanDevice(PanObject):
             dict: Job result
 
         """
-        try:
-            import http.client as httplib
-        except ImportError:
-            import httplib
         if interval is not None:
             try:
                 interval = float(interval)
@@ -4656,58 +4703,19 @@ class PanDevice(PanObject):
         except AttributeError:
             job = job_id
 
-        cmd = 'show jobs id "%s"' % job
         start_time = time.time()
 
         self._logger.debug("Waiting for job to finish...")
 
-        attempts = 0
         while True:
-            try:
-                attempts += 1
-                job_xml = self.xapi.op(cmd=cmd, cmd_xml=True, retry_on_peer=True)
-            except (pan.xapi.PanXapiError, err.PanDeviceError) as e:
-                # Connection errors (URLError) are ok, this can happen in PAN-OS 7.0.1 and 7.0.2
-                # if the hostname is changed
-                # Invalid cred errors are ok because FW auth system takes longer to start up in these cases
-                # Other errors should be raised
-                if not str(e).startswith("URLError:") and not str(e).startswith(
-                    "Invalid credentials."
-                ):
-                    # Error not related to connection issue.  Raise it.
-                    raise e
-                else:
-                    # self._logger.debug2("Sleep %.2f seconds" % interval)
-                    time.sleep(interval)
-                    continue
-            except httplib.BadStatusLine as e:
-                # Connection issue.  The firewall is currently restarting the API service or rebooting
+            result = self._check_job(job, sync_all=sync_all)
+            if result is False:
+                # Connection issue, keep trying without checking the timeout
                 # self._logger.debug2("Sleep %.2f seconds" % interval)
                 time.sleep(interval)
                 continue
-
-            status = job_xml.find("./result/job/status")
-            if status is None:
-                raise pan.xapi.PanXapiError(
-                    "No status element in " + "'%s' response" % cmd
-                )
-            if status.text == "FIN" and sync_all:
-                # Check the status of each device commit
-                device_commits_finished = True
-                device_results = job_xml.findall("./result/job/devices/entry/result")
-                for device_result in device_results:
-                    if device_result.text == "PEND":
-                        device_commits_finished = False
-                        break  # One device isn't finished, so stop checking others
-                if device_results and device_commits_finished:
-                    return self._parse_job_results(job_xml, get_devices=True)
-                elif not device_results:
-                    return self._parse_job_results(job_xml, get_devices=False)
-            elif status.text == "FIN":
-                # Job completed, parse the results
-                return self._parse_job_results(job_xml, get_devices=False)
-
-            logger.debug("Job %s status %s" % (job, status.text))
+            elif result is not None:
+                return result
 
             if (
                 self.timeout is not None
@@ -4721,6 +4729,63 @@ class PanDevice(PanObject):
             # self._logger.debug2("Sleep %.2f seconds" % interval)
             time.sleep(interval)
 
+    def _check_job(self, job, sync_all=False):
+        """Check on a job once without waiting for it
+
+        Args:
+            job (str): The job ID
+            sync_all (bool): Wait for all devices to complete if commit all operation
+
+        Returns:
+            dict: Job result if the job is finished, None if it is still
+            running, or False if the device could not be reached
+
+        """
+        try:
+            import http.client as httplib
+        except ImportError:
+            import httplib
+
+        cmd = 'show jobs id "%s"' % job
+        try:
+            job_xml = self.xapi.op(cmd=cmd, cmd_xml=True, retry_on_peer=True)
+        except (pan.xapi.PanXapiError, err.PanDeviceError) as e:
+            # Connection errors (URLError) are ok, this can happen in PAN-OS 7.0.1 and 7.0.2
+            # if the hostname is changed
+            # Invalid cred errors are ok because FW auth system takes longer to start up in these cases
+            # Other errors should be raised
+            if not str(e).startswith("URLError:") and not str(e).startswith(
+                "Invalid credentials."
+            ):
+                # Error not related to connection issue.  Raise it.
+                raise e
+            else:
+                return False
+        except httplib.BadStatusLine as e:
+            # Connection issue.  The firewall is currently restarting the API service or rebooting
+            return False
+
+        status = job_xml.find("./result/job/status")
+        if status is None:
+            raise pan.xapi.PanXapiError("No status element in " + "'%s' response" % cmd)
+        if status.text == "FIN" and sync_all:
+            # Check the status of each device commit
+            device_commits_finished = True
+            device_results = job_xml.findall("./result/job/devices/entry/result")
+            for device_result in device_results:
+                if device_result.text == "PEND":
+                    device_commits_finished = False
+                    break  # One device isn't finished, so stop checking others
+            if device_results and device_commits_finished:
+                return self._parse_job_results(job_xml, get_devices=True)
+            elif not device_results:
+                return self._parse_job_results(job_xml, get_devices=False)
+        elif status.text == "FIN":
+            # Job completed, parse the results
+            return self._parse_job_results(job_xml, get_devices=False)
+
+        logger.debug("Job %s status %s" % (job, status.text))
+
     def syncreboot(self, interval=5.0, timeout=600):
         """Block until reboot completes and return version of device"""
         try:
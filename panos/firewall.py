@@ -20,16 +20,33 @@
 import itertools
 import logging
 import re
+import time
 import xml.etree.ElementTree as ET
-from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+import pan.xapi
 
 import panos.errors as err
-from panos import device, getlogger, yesno
+from panos import device, getlogger, isstring, yesno
 from panos.base import ENTRY, PanDevice, Root
 from panos.base import VarPath as Var
 
 logger = getlogger(__name__)
 
+# Parsers for the output of "show system resources".  Each pattern only
+# looks at a single line of the top output, and covers both the pre-9.0
+# format ("96.0%id", "Mem: 4048756k total") and the 9.0+ format
+# ("96.0 id,", "KiB Mem : 4048756 total").
+_SYS_RES_LOAD_RE = re.compile(r"load average:\s*([\d.]+)")
+_SYS_RES_CPU_IDLE_RE = re.compile(r"([\d.]+) ?%?id\b")
+_SYS_RES_MEM_TOTAL_RE = re.compile(r"Mem\s*:\s*(\d+)k? total")
+_SYS_RES_MEM_FREE_RE = re.compile(r"Mem\s*:[^\n]*?\b(\d+)k? free")
+
+
+def _quote_attrib(value):
+    """Quote an attribute value the way ET.tostring() does"""
+    return '"%s"' % escape(value, {'"': "&quot;", "\n": "&#10;"})
+
 
 class Firewall(PanDevice):
     """A Palo Alto Networks Firewall
@@ -51,6 +68,24 @@ class Firewall(PanDevice):
 
     """
 
+    # Slots for the attributes set in __init__ below.  The base classes still
+    # provide a __dict__ for everything else, so this only moves these
+    # attributes out of it.  Subclasses adding attributes of their own
+    # should declare them in their own __slots__.
+    __slots__ = (
+        "_logger",
+        "serial",
+        "_vsys",
+        "_is_numbered_vsys",
+        "_xpath_vsys_cached",
+        "vsys_name",
+        "multi_vsys",
+        "serial_ha_peer",
+        "management_ip",
+        "shared",
+        "state",
+    )
+
     XPATH = "/devices"
     ROOT = Root.MGTCONFIG
     SUFFIX = ENTRY
@@ -130,7 +165,8 @@ class Firewall(PanDevice):
         self._logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
 
         self.serial = serial
-        self._vsys = vsys
+        self.vsys = vsys
+        self._xpath_vsys_cached = None
         self.vsys_name = vsys_name
         self.multi_vsys = multi_vsys
         self.serial_ha_peer = serial_ha_peer
@@ -166,13 +202,25 @@ class Firewall(PanDevice):
     @vsys.setter
     def vsys(self, value):
         self._vsys = value
+        # Saved here so that create_vsys(), delete_vsys() and element() don't
+        # have to check the vsys name each time they run.
+        self._is_numbered_vsys = isstring(value) and value.startswith("vsys")
         # Check if attribute exists because this could be called during
         # init of the object before _ha_peer exists.
         if hasattr(self, "_ha_peer") and self.ha_peer is not None:
             self.ha_peer._vsys = value
+            self.ha_peer._is_numbered_vsys = self._is_numbered_vsys
 
     def xpath_vsys(self):
-        return self._root_xpath_vsys(self.vsys)
+        # The xpath is cached along with the vsys it was built for, so that
+        # changes made to "shared" or "_vsys" directly (such as by the HA
+        # peer) are still picked up.
+        vsys = self.vsys
+        cached = self._xpath_vsys_cached
+        if cached is None or cached[0] != vsys:
+            cached = (vsys, self._root_xpath_vsys(vsys))
+            self._xpath_vsys_cached = cached
+        return cached[1]
 
     def xpath_panorama(self):
         raise err.PanDeviceError(
@@ -215,16 +263,16 @@ class Firewall(PanDevice):
         # to this firewall's serial number.  This happens when panorama and serial
         # variables are set in this firewall prior to the first connection.
         try:
-            self.panorama()
+            pano = self.panorama()
         except err.PanDeviceNotSet:
             return super(Firewall, self).generate_xapi()
         if self.serial is not None and self.hostname is None:
             xapi_constructor = PanDevice.XapiWrapper
             kwargs = {
                 "pan_device": self,
-                "api_key": self.panorama().api_key,
-                "hostname": self.panorama().hostname,
-                "port": self.panorama().port,
+                "api_key": pano.api_key,
+                "hostname": pano.hostname,
+                "port": pano.port,
                 "timeout": self.timeout,
                 "serial": self.serial,
             }
@@ -241,27 +289,50 @@ class Firewall(PanDevice):
         super(Firewall, self)._save_system_info(system_info)
         self.multi_vsys = system_info["system"]["multi-vsys"] == "on"
 
-    def element(self):
-        if self.serial is None:
-            raise ValueError("Serial number must be set to generate element")
-        entry = ET.Element("entry", {"name": self.serial})
+    def _vsys_entry_names(self):
+        """Vsys to list in this firewall's Panorama entry, or None for no vsys"""
         if self.parent == self.panorama() and self.serial is not None:
             # This is a firewall under a panorama
             if not self.multi_vsys:
-                vsys = ET.SubElement(entry, "vsys")
-                ET.SubElement(vsys, "entry", {"name": "vsys1"})
+                return ["vsys1"]
         elif self.parent == self.devicegroup() and self.multi_vsys:
             # This is a firewall under a device group
-            if self.vsys.startswith("vsys"):
-                vsys = ET.SubElement(entry, "vsys")
-                ET.SubElement(vsys, "entry", {"name": self.vsys})
+            if not self.shared and self._is_numbered_vsys:
+                return [self.vsys]
             else:
-                vsys = ET.SubElement(entry, "vsys")
-                all_vsys = self.findall(device.Vsys)
-                for a_vsys in all_vsys:
-                    ET.SubElement(vsys, "entry", {"name": a_vsys})
+                return [x.name for x in self.findall(device.Vsys)]
+
+    def element(self):
+        if self.serial is None:
+            raise ValueError("Serial number must be set to generate element")
+        entry = ET.Element("entry", {"name": self.serial})
+        vsys_names = self._vsys_entry_names()
+        if vsys_names is not None:
+            vsys = ET.SubElement(entry, "vsys")
+            for name in vsys_names:
+                ET.SubElement(vsys, "entry", {"name": name})
         return entry
 
+    def element_str(self, pretty_print=False):
+        if pretty_print:
+            return super(Firewall, self).element_str(pretty_print)
+        # Format the string directly instead of serializing element(), which
+        # would allocate a node for every vsys just to turn it into text.
+        if self.serial is None:
+            raise ValueError("Serial number must be set to generate element")
+        name = _quote_attrib(self.serial)
+        vsys_names = self._vsys_entry_names()
+        if vsys_names is None:
+            return ("<entry name=%s />" % name).encode("utf-8")
+        elif not vsys_names:
+            parts = ["<entry name=%s><vsys />" % name]
+        else:
+            parts = ["<entry name=%s><vsys>" % name]
+            parts.extend("<entry name=%s />" % _quote_attrib(x) for x in vsys_names)
+            parts.append("</vsys>")
+        parts.append("</entry>")
+        return "".join(parts).encode("utf-8")
+
     def apply(self):
         return
 
@@ -290,23 +361,26 @@ class Firewall(PanDevice):
         )
         if self.parent == self.devicegroup() and self.multi_vsys:
             # This is a firewall under a devicegroup
-            # Refresh device-group first to see if this is the only vsys
-            devices_xpath = self.devicegroup().xpath() + self.XPATH
-            devices_xml = panorama.xapi.get(devices_xpath)
-            dg_vsys = devices_xml.findall(
-                "result/devices/entry[@name='%s']/vsys/entry" % self.serial
-            )
-            if dg_vsys:
-                if len(dg_vsys) == 1:
-                    # Only vsys, so delete whole entry
-                    panorama.set_config_changed()
-                    panorama.xapi.delete(self.xpath())
-                else:
-                    # It's not the only vsys, just delete the vsys
-                    panorama.set_config_changed()
-                    panorama.xapi.delete(
-                        self.xpath() + "/vsys/entry[@name='%s']" % self.vsys
-                    )
+            # Refresh device-group first to see if this is the only vsys.
+            # Only this firewall's vsys list is requested so that the
+            # response doesn't contain every device in the device-group.
+            # This can't be batched with the delete that follows: which
+            # xpath gets deleted depends on the answer, and removing the
+            # last vsys entry on its own would leave a device entry with
+            # no vsys, which means "all vsys" to Panorama.
+            vsys_xml = panorama.xapi.get(self.xpath() + "/vsys")
+            dg_vsys = vsys_xml.find("result/vsys")
+            num_vsys = 0 if dg_vsys is None else len(dg_vsys)
+            if num_vsys == 1:
+                # Only vsys, so delete whole entry
+                panorama.set_config_changed()
+                panorama.xapi.delete(self.xpath())
+            elif num_vsys > 1:
+                # It's not the only vsys, just delete the vsys
+                panorama.set_config_changed()
+                panorama.xapi.delete(
+                    self.xpath() + "/vsys/entry[@name='%s']" % self.vsys
+                )
         else:
             # This is a firewall under a panorama
             panorama.set_config_changed()
@@ -316,19 +390,23 @@ class Firewall(PanDevice):
 
     def create_vsys(self):
         """Create the vsys on the live device that this Firewall object represents"""
-        if self.vsys.startswith("vsys"):
-            element = ET.Element("entry", {"name": self.vsys})
-            if self.vsys_name is not None:
-                ET.SubElement(element, "display-name").text = self.vsys_name
+        if not self.shared and self._is_numbered_vsys:
+            # The element is small enough that formatting it directly is
+            # cheaper than building and serializing an ElementTree.
+            if self.vsys_name is None:
+                element = "<entry name=%s/>" % quoteattr(self.vsys)
+            else:
+                element = "<entry name=%s><display-name>%s</display-name></entry>" % (
+                    quoteattr(self.vsys),
+                    escape(self.vsys_name),
+                )
             self.set_config_changed()
             path = self._root_xpath_vsys(None).rsplit("/", 1)[0]
-            self.xapi.set(
-                path, ET.tostring(element, encoding="utf-8"), retry_on_peer=True
-            )
+            self.xapi.set(path, element, retry_on_peer=True)
 
     def delete_vsys(self):
         """Delete the vsys on the live device that this Firewall object represents"""
-        if self.vsys.startswith("vsys"):
+        if not self.shared and self._is_numbered_vsys:
             self.set_config_changed()
             self.xapi.delete(self._root_xpath_vsys(self.vsys), retry_on_peer=True)
 
@@ -355,8 +433,9 @@ class Firewall(PanDevice):
                 xml, refresh_children=False, variables=op_vars
             )
             # Add system settings to firewall instances
+            entries = dict((x.get("name"), x) for x in xml.findall("entry"))
             for fw in firewall_instances:
-                entry = xml.find("entry[@name='%s']" % fw.serial)
+                entry = entries[fw.serial]
                 system = fw.find_or_create(None, device.SystemSettings)
                 system.hostname = entry.findtext("hostname")
                 system.ip_address = entry.findtext("ip-address")
@@ -382,28 +461,24 @@ class Firewall(PanDevice):
         return firewall_instances
 
     def show_system_resources(self):
+        # Only needed here, so avoid importing it with the module
+        from decimal import Decimal
+
         self.xapi.op(cmd="show system resources", cmd_xml=True)
         result = self.xapi.xml_root()
-        if self._version_info >= (9, 0, 0):
-            regex = re.compile(
-                r"load average: ([\d\.]+).*? ([\d\.]+) id,.*KiB Mem : (\d+) total,.*? (\d+) free",
-                re.DOTALL,
-            )
-        else:
-            regex = re.compile(
-                r"load average: ([\d.]+).* ([\d.]+)%id.*Mem:.*?([\d.]+)k total.*?([\d]+)k free",
-                re.DOTALL,
-            )
-        match = regex.search(result)
-        if match:
+        load = _SYS_RES_LOAD_RE.search(result)
+        cpu_idle = _SYS_RES_CPU_IDLE_RE.search(result)
+        mem_total = _SYS_RES_MEM_TOTAL_RE.search(result)
+        mem_free = _SYS_RES_MEM_FREE_RE.search(result)
+        if load and cpu_idle and mem_total and mem_free:
             """
             return cpu, mem_free, load
             """
             return {
-                "load": Decimal(match.group(1)),
-                "cpu": 100 - Decimal(match.group(2)),
-                "mem_total": int(match.group(3)),
-                "mem_free": int(match.group(4)),
+                "load": Decimal(load.group(1)),
+                "cpu": 100 - Decimal(cpu_idle.group(1)),
+                "mem_total": int(mem_total.group(1)),
+                "mem_free": int(mem_free.group(1)),
             }
         else:
             raise err.PanDeviceError(
@@ -420,6 +495,138 @@ class Firewall(PanDevice):
             sync=sync, exclude="device-and-network", exception=exception
         )
 
+    def submit_commit_device_and_network(self, exception=False):
+        """Start a device and network commit without waiting for it
+
+        Args:
+            exception (bool): Create an exception if no commit is needed (Default: False)
+
+        Returns:
+            str: The job ID of the commit, or None if no commit is needed.
+            Pass it to :meth:`wait_commits()` to wait for the result.
+
+        """
+        return self._commit_submit(exclude="policy-and-objects", exception=exception)
+
+    def submit_commit_policy_and_objects(self, exception=False):
+        """Start a policy and objects commit without waiting for it
+
+        Args:
+            exception (bool): Create an exception if no commit is needed (Default: False)
+
+        Returns:
+            str: The job ID of the commit, or None if no commit is needed.
+            Pass it to :meth:`wait_commits()` to wait for the result.
+
+        """
+        return self._commit_submit(exclude="device-and-network", exception=exception)
+
+    @classmethod
+    def wait_commits(cls, firewalls_with_jobs, interval=0.5, exception=False):
+        """Wait for commits that were started on several firewalls
+
+        All the jobs are checked in turn each interval, so waiting on many
+        firewalls takes about as long as the slowest commit.
+
+        Args:
+            firewalls_with_jobs (list): (:class:`Firewall`, job ID) pairs, such
+                as from :meth:`submit_commit_device_and_network()`
+            interval (float): Interval in seconds to check if the jobs are complete
+            exception (bool): Create an exception on commit errors (Default: False).
+                The exception is only raised once every job has finished,
+                and is for the first failed commit in ``firewalls_with_jobs``.
+
+        Returns:
+            list: The commit results, in the same order as ``firewalls_with_jobs``.
+            The entry is None for pairs where the job ID is None.
+
+        """
+        results = [None] * len(firewalls_with_jobs)
+        pending = dict(
+            (num, pair)
+            for num, pair in enumerate(firewalls_with_jobs)
+            if pair[1] is not None
+        )
+        start_time = time.time()
+
+        while True:
+            unreachable = set()
+            for num, (fw, jobid) in list(pending.items()):
+                result = fw._check_job(jobid)
+                if result is False:
+                    # Connection issue, keep trying without checking the timeout
+                    unreachable.add(num)
+                elif result is not None:
+                    results[num] = fw._commit_result(result)
+                    del pending[num]
+
+            if not pending:
+                break
+
+            for num, (fw, jobid) in pending.items():
+                if (
+                    num not in unreachable
+                    and fw.timeout is not None
+                    and fw.timeout != 0
+                    and time.time() > start_time + fw.timeout
+                ):
+                    raise pan.xapi.PanXapiError(
+                        "Timeout waiting for " + "job %s completion" % jobid
+                    )
+
+            time.sleep(interval)
+
+        if exception:
+            for (fw, jobid), result in zip(firewalls_with_jobs, results):
+                if result is not None and not result["success"]:
+                    raise err.PanCommitFailed(pan_device=fw, result=result)
+
+        return results
+
+    @classmethod
+    def commit_many(cls, firewalls, exclude=None, sync=False, exception=False):
+        """Trigger a commit on several firewalls at once
+
+        Every commit is started before waiting on any of them, so the
+        firewalls commit in parallel instead of one after the other.
+
+        Args:
+            firewalls (list): The :class:`Firewall` objects to commit
+            exclude (str): Part of the configuration to leave out of the
+                commits, either "device-and-network" or "policy-and-objects"
+            sync (bool): Block until all the commits are finished (Default: False)
+            exception (bool): Create an exception on commit errors (Default: False).
+                Commit errors are only known once the jobs finish, so this
+                has no effect unless sync is True.
+
+        Returns:
+            list: The job ID (or the commit results if sync is True) of each
+            firewall's commit, in the same order as ``firewalls``.  The entry
+            is None for firewalls that did not need a commit.
+
+        Raises:
+            Exception: Any error from starting a commit, such as a connection
+                error or :class:`panos.errors.PanCommitInProgress`.  No more
+                commits are started after it, and the (firewall, job ID) pairs
+                of the commits that were already started are saved in the
+                exception's ``submitted`` attribute, ready for
+                :meth:`wait_commits()`.
+
+        """
+        # A firewall with nothing to commit must not stop the others from
+        # being submitted, so exception only applies to the commit results.
+        jobs = []
+        for fw in firewalls:
+            try:
+                jobs.append(fw._commit_submit(exclude=exclude, exception=False))
+            except Exception as e:
+                e.submitted = [x for x in zip(firewalls, jobs) if x[1] is not None]
+                raise
+        if not sync:
+            return jobs
+
+        return cls.wait_commits(list(zip(firewalls, jobs)), exception=exception)
+
     def organize_into_vsys(self, create_vsys_objects=True, refresh_vsys=True):
         """Organizes all imported objects under the appropriate Vsys object.
 
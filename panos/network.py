@@ -482,26 +482,26 @@ class Interface(VsysOperations):
 
         device = self.nearest_pandevice()
         cmd = 'show counter interface "{0}"'.format(self.name)
-        pconf = device.op(cmd)
-        pconf = PanConfig(pconf)
-        response = pconf.python()
-        logger.debug("response: " + str(response))
-        counters = response["response"]["result"]
-        if counters is not None:
-            entry = {}
-            # Check for entry in ifnet
-            if "entry" in counters.get("ifnet", {}):
-                entry = counters["ifnet"]["entry"][0]
-            elif "ifnet" in counters.get("ifnet", {}):
-                if "entry" in counters["ifnet"].get("ifnet", {}):
-                    entry = counters["ifnet"]["ifnet"]["entry"][0]
-
-            # Convert strings to integers, if they are integers
-            entry.update((k, panos.convert_if_int(v)) for k, v in entry.items())
-
-            # If empty dictionary (no results) it usually means the interface is not
-            # configured, so return None
-            return entry if entry else None
+        response = device.op(cmd)
+
+        # Only the first ifnet entry is needed, so look it up directly and
+        # convert just that entry into python objects.
+        elm = response.find("./result/ifnet/entry")
+        if elm is None:
+            elm = response.find("./result/ifnet/ifnet/entry")
+        if elm is None:
+            # No results usually means the interface is not configured
+            return None
+
+        # Convert strings to integers, if they are integers.  Booleans from
+        # yes/no values are left alone, as int() would turn them into 1/0.
+        counters = PanConfig(config=elm).python()[elm.tag] or {}
+        entry = {
+            k: v if isinstance(v, bool) else panos.convert_if_int(v)
+            for k, v in counters.items()
+        }
+
+        return entry if entry else None
 
     def refresh_state(self):
         """Pull the state of the interface from the firewall
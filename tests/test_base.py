@@ -15,6 +15,10 @@ try:
     from unittest import mock
 except ImportError:
     import mock
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
 import unittest
 import uuid
 import xml.etree.ElementTree as ET
@@ -1156,6 +1160,14 @@ class TestParentAwareXpathBasics(unittest.TestCase):
 
         self.assertRaises(ValueError, obj._get_versioned_value, (1, 0, 0), parent)
 
+    def test_parent_params_not_checked_without_param_profiles(self):
+        parent = mock.Mock()
+
+        self.assertEqual(
+            self.DEFAULT_PATH_2, self.obj._get_versioned_value((1, 0, 0), parent)
+        )
+        self.assertFalse(parent._about_object.called)
+
 
 class TestParentAwareXpathWithParams(unittest.TestCase):
     OLD_LAYER3_PATH = "/units/layer3/old"
@@ -1370,6 +1382,176 @@ class TestPanDevice(unittest.TestCase):
         self.assertEqual(ad.get("installed"), "yes")
         self.assertEqual(ad.get("downloaded"), "yes")
 
+    def test_xapi_calls_patched_pan_xapi_method(self):
+        # Make sure the wrapper methods exist before patching.
+        self.obj.xapi
+
+        obj = Base.PanDevice("localhost", "admin", "admin", "secret")
+        obj.xapi.element_root = None
+        with mock.patch.object(pan.xapi.PanXapi, "op") as m_op:
+            obj.xapi.op(cmd="show system info", retry_on_peer=False)
+
+        m_op.assert_called_once_with(obj.xapi, cmd="show system info")
+
+    def _pending_changes(self, result):
+        self.obj._xapi_private = mock.Mock()
+        self.obj._xapi_private.element_result = ET.fromstring(result)
+
+        ans = self.obj.pending_changes()
+
+        self.obj.xapi.op.assert_called_once_with(
+            cmd="check pending-changes", cmd_xml=True, retry_on_peer=True
+        )
+        return ans
+
+    def test_pending_changes_yes(self):
+        self.assertTrue(self._pending_changes("<result>yes</result>"))
+
+    def test_pending_changes_no(self):
+        self.assertFalse(self._pending_changes("<result>no</result>"))
+
+
+class TestPanDeviceCommitJobs(unittest.TestCase):
+    DEVICE = (
+        "<entry><serial-no>0001</serial-no><devicename>fw1</devicename>"
+        "<result>{0}</result><tstart>start</tstart><tfin>end</tfin>"
+        "<details>details</details></entry>"
+    )
+
+    def setUp(self):
+        self.obj = Base.PanDevice("localhost", "admin", "admin", "secret")
+        self.obj._version_info = (99, 0, 0)
+        self.obj._xapi_private = mock.Mock()
+        self.obj.timeout = 10
+
+    def _job_xml(self, status, devices=None):
+        if devices is None:
+            devices = ""
+        else:
+            devices = "<devices>{0}</devices>".format(
+                "".join(self.DEVICE.format(x) for x in devices)
+            )
+        return ET.fromstring(
+            '<response status="success"><result><job>'
+            "<tenq>enqueued</tenq><id>5</id><user>admin</user><type>Commit</type>"
+            "<status>{0}</status><result>{1}</result><tfin>finished</tfin>"
+            "<warnings/><details><line>Configuration committed</line></details>"
+            "{2}</job></result></response>".format(
+                status, "OK" if status == "FIN" else "PEND", devices
+            )
+        )
+
+    def _assert_job_checks(self, count):
+        self.assertEqual(
+            [mock.call(cmd='show jobs id "5"', cmd_xml=True, retry_on_peer=True)]
+            * count,
+            self.obj.xapi.op.call_args_list,
+        )
+
+    def test_check_job_fin(self):
+        self.obj.xapi.op.return_value = self._job_xml("FIN")
+
+        ret_val = self.obj._check_job("5")
+
+        self.assertTrue(ret_val["success"])
+        self.assertEqual("5", ret_val["jobid"])
+        self.assertEqual(["Configuration committed"], ret_val["messages"])
+        self._assert_job_checks(1)
+
+    def test_check_job_pend(self):
+        self.obj.xapi.op.return_value = self._job_xml("PEND")
+
+        self.assertIsNone(self.obj._check_job("5"))
+
+    def test_check_job_url_error(self):
+        self.obj.xapi.op.side_effect = pan.xapi.PanXapiError("URLError: reason")
+
+        self.assertIs(False, self.obj._check_job("5"))
+
+    def test_check_job_other_error_raises_error(self):
+        self.obj.xapi.op.side_effect = pan.xapi.PanXapiError("Some other error")
+
+        self.assertRaises(pan.xapi.PanXapiError, self.obj._check_job, "5")
+
+    @mock.patch("time.sleep")
+    def test_syncjob_waits_for_pending_job(self, m_sleep):
+        self.obj.xapi.op.side_effect = [self._job_xml("PEND"), self._job_xml("FIN")]
+
+        ret_val = self.obj.syncjob("5", interval=2)
+
+        self.assertTrue(ret_val["success"])
+        self._assert_job_checks(2)
+        m_sleep.assert_called_once_with(2.0)
+
+    @mock.patch("time.sleep")
+    def test_syncjob_sync_all_waits_for_pending_devices(self, m_sleep):
+        self.obj.xapi.op.side_effect = [
+            self._job_xml("FIN", ["PEND"]),
+            self._job_xml("FIN", ["OK"]),
+        ]
+
+        ret_val = self.obj.syncjob("5", sync_all=True)
+
+        self.assertTrue(ret_val["success"])
+        self.assertTrue(ret_val["devices"]["0001"]["success"])
+        self._assert_job_checks(2)
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time")
+    def test_syncjob_retries_connection_errors_past_timeout(self, m_time, m_sleep):
+        self.obj.xapi.op.side_effect = [
+            pan.xapi.PanXapiError("URLError: reason"),
+            pan.xapi.PanXapiError("Invalid credentials."),
+            httplib.BadStatusLine(""),
+            self._job_xml("FIN"),
+        ]
+        m_time.side_effect = [0, 100]
+
+        ret_val = self.obj.syncjob("5")
+
+        self.assertTrue(ret_val["success"])
+        self._assert_job_checks(4)
+        self.assertEqual(3, m_sleep.call_count)
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time")
+    def test_syncjob_timeout_raises_error(self, m_time, m_sleep):
+        self.obj.xapi.op.return_value = self._job_xml("PEND")
+        m_time.side_effect = [0, 5, 11]
+
+        self.assertRaises(pan.xapi.PanXapiError, self.obj.syncjob, "5")
+        self._assert_job_checks(2)
+
+    def _commit(self, **kwargs):
+        self.obj.xapi.commit.return_value = ET.fromstring(
+            '<response status="success"><result><msg/><job>5</job></result></response>'
+        )
+        self.obj.xapi.op.return_value = self._job_xml("FIN")
+
+        return self.obj._commit(**kwargs)
+
+    def test_commit_async_returns_job_id(self):
+        self.assertEqual("5", self._commit(sync=False))
+        self.assertFalse(self.obj.xapi.op.called)
+
+    def test_commit_sync_returns_result(self):
+        ret_val = self._commit(sync=True)
+
+        self.assertTrue(ret_val["success"])
+        self.assertEqual("5", ret_val["jobid"])
+        self._assert_job_checks(1)
+
+    def test_commit_not_needed(self):
+        self.obj.xapi.commit.return_value = ET.fromstring(
+            '<response status="success"><msg>There are no changes</msg></response>'
+        )
+
+        self.assertIsNone(self.obj._commit(sync=True))
+        self.assertRaises(
+            Err.PanCommitNotNeeded, self.obj._commit, sync=True, exception=True
+        )
+        self.assertFalse(self.obj.xapi.op.called)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -12,10 +12,20 @@
 # ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import copy
 import unittest
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
+import pan.xapi
 
 import panos
 import panos.firewall
+import panos.panorama
 
 
 class TestFirewall(unittest.TestCase):
@@ -46,6 +56,530 @@ class TestFirewall(unittest.TestCase):
 
         self.assertEqual(expected, ret_val)
 
+    def test_deepcopy_keeps_slot_attributes(self):
+        fw = panos.firewall.Firewall(serial="serial#", vsys="vsys2", multi_vsys=True)
+
+        ret_val = copy.deepcopy(fw)
+
+        self.assertEqual("serial#", ret_val.serial)
+        self.assertEqual("vsys2", ret_val.vsys)
+        self.assertTrue(ret_val.multi_vsys)
+        self.assertFalse(ret_val.shared)
+
+    def test_xpath_vsys_follows_vsys_changes(self):
+        fw = panos.firewall.Firewall("fw", vsys="vsys2")
+        base_xpath = "/config/devices/entry[@name='localhost.localdomain']/vsys"
+
+        self.assertEqual(base_xpath + "/entry[@name='vsys2']", fw.xpath_vsys())
+
+        fw.vsys = "vsys3"
+        self.assertEqual(base_xpath + "/entry[@name='vsys3']", fw.xpath_vsys())
+
+        fw.vsys = "shared"
+        self.assertEqual("/config/shared", fw.xpath_vsys())
+
+        fw.vsys = None
+        self.assertEqual(base_xpath + "/entry[@name='vsys1']", fw.xpath_vsys())
+
+    def test_xpath_vsys_follows_ha_peer_vsys(self):
+        fw1 = panos.firewall.Firewall("fw1", vsys="vsys2")
+        fw2 = panos.firewall.Firewall("fw2", vsys="vsys2")
+        fw1.set_ha_peers(fw2)
+        fw2.xpath_vsys()
+
+        fw1.vsys = "vsys3"
+
+        self.assertEqual(fw1.xpath_vsys(), fw2.xpath_vsys())
+
+
+class TestFirewallElement(unittest.TestCase):
+    def _check(self, fw, expected):
+        self.assertEqual(expected, ET.tostring(fw.element()).decode("utf-8"))
+        self.assertEqual(expected.encode("utf-8"), fw.element_str())
+
+    def test_under_panorama(self):
+        pano = panos.panorama.Panorama("pano")
+        fw = panos.firewall.Firewall(serial="serial#")
+        pano.add(fw)
+
+        self._check(
+            fw, '<entry name="serial#"><vsys><entry name="vsys1" /></vsys></entry>'
+        )
+
+    def test_multi_vsys_under_panorama(self):
+        pano = panos.panorama.Panorama("pano")
+        fw = panos.firewall.Firewall(serial="serial#", multi_vsys=True)
+        pano.add(fw)
+
+        self._check(fw, '<entry name="serial#" />')
+
+    def test_vsys_under_device_group(self):
+        pano = panos.panorama.Panorama("pano")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(serial="serial#", vsys="vsys2", multi_vsys=True)
+        dg.add(fw)
+
+        self._check(
+            fw, '<entry name="serial#"><vsys><entry name="vsys2" /></vsys></entry>'
+        )
+
+    def test_all_vsys_under_device_group(self):
+        pano = panos.panorama.Panorama("pano")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(serial="serial#", vsys="shared", multi_vsys=True)
+        fw.add(panos.device.Vsys("vsys2"))
+        fw.add(panos.device.Vsys("vsys3"))
+        dg.add(fw)
+
+        self._check(
+            fw,
+            '<entry name="serial#"><vsys><entry name="vsys2" />'
+            '<entry name="vsys3" /></vsys></entry>',
+        )
+
+    def test_shared_under_device_group(self):
+        pano = panos.panorama.Panorama("pano")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(serial="serial#", vsys="vsys2", multi_vsys=True)
+        fw.shared = True
+        fw.add(panos.device.Vsys("vsys3"))
+        dg.add(fw)
+
+        self._check(
+            fw, '<entry name="serial#"><vsys><entry name="vsys3" /></vsys></entry>'
+        )
+
+    def test_escaped_values_match_element(self):
+        pano = panos.panorama.Panorama("pano")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(
+            serial="a\"b<c>&'d", vsys="shared", multi_vsys=True
+        )
+        fw.add(panos.device.Vsys('vsys"2'))
+        dg.add(fw)
+
+        self.assertEqual(ET.tostring(fw.element(), encoding="utf-8"), fw.element_str())
+        self._check(
+            fw,
+            '<entry name="a&quot;b&lt;c&gt;&amp;\'d"><vsys>'
+            '<entry name="vsys&quot;2" /></vsys></entry>',
+        )
+
+    def test_no_vsys_under_device_group(self):
+        pano = panos.panorama.Panorama("pano")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(serial="serial#", vsys="shared", multi_vsys=True)
+        dg.add(fw)
+
+        self._check(fw, '<entry name="serial#"><vsys /></entry>')
+
+
+class TestFirewallDeleteFromDeviceGroup(unittest.TestCase):
+    def _setup(self, vsys_list):
+        pano = panos.panorama.Panorama("pano", api_key="secret")
+        dg = panos.panorama.DeviceGroup("dg")
+        pano.add(dg)
+        fw = panos.firewall.Firewall(serial="serial#", vsys="vsys2", multi_vsys=True)
+        dg.add(fw)
+
+        resp = ET.fromstring(
+            "<response><result><vsys>{0}</vsys></result></response>".format(
+                "".join('<entry name="{0}"/>'.format(x) for x in vsys_list)
+            )
+        )
+        pano._xapi_private = mock.Mock()
+        pano._xapi_private.get.return_value = resp
+
+        return pano, dg, fw
+
+    def test_delete_only_vsys_deletes_firewall(self):
+        pano, dg, fw = self._setup(["vsys2"])
+        fw_xpath = fw.xpath()
+
+        fw.delete()
+
+        pano.xapi.get.assert_called_once_with(fw_xpath + "/vsys")
+        pano.xapi.delete.assert_called_once_with(fw_xpath)
+        self.assertNotIn(fw, dg.children)
+
+    def test_delete_one_of_many_vsys_deletes_vsys(self):
+        pano, dg, fw = self._setup(["vsys1", "vsys2"])
+        fw_xpath = fw.xpath()
+
+        fw.delete()
+
+        pano.xapi.get.assert_called_once_with(fw_xpath + "/vsys")
+        pano.xapi.delete.assert_called_once_with(
+            fw_xpath + "/vsys/entry[@name='vsys2']"
+        )
+        self.assertNotIn(fw, dg.children)
+
+
+class TestFirewallRefreshallFromShowDevices(unittest.TestCase):
+    def test_system_settings_and_state_match_serial(self):
+        xml = ET.fromstring(
+            "<devices>{0}{1}</devices>".format(
+                *[
+                    "<entry name='{0}'><serial>{0}</serial>"
+                    "<hostname>{1}</hostname><ip-address>{2}</ip-address>"
+                    "<connected>{3}</connected>"
+                    "<unsupported-version>no</unsupported-version>"
+                    "<multi-vsys>no</multi-vsys></entry>".format(*x)
+                    for x in (
+                        ("serial1", "fw1", "10.0.0.1", "yes"),
+                        ("serial2", "fw2", "10.0.0.2", "no"),
+                    )
+                ]
+            )
+        )
+
+        fws = panos.firewall.Firewall().refreshall_from_xml(xml)
+
+        self.assertEqual(["serial1", "serial2"], [x.serial for x in fws])
+        for fw, hostname, ip, connected in zip(
+            fws, ("fw1", "fw2"), ("10.0.0.1", "10.0.0.2"), (True, False)
+        ):
+            system = fw.find("", panos.device.SystemSettings)
+            self.assertEqual(hostname, system.hostname)
+            self.assertEqual(ip, system.ip_address)
+            self.assertEqual(connected, fw.state.connected)
+
+
+class TestFirewallCreateVsys(unittest.TestCase):
+    def _create_vsys(self, vsys_name):
+        fw = panos.firewall.Firewall(
+            "fw", api_key="secret", vsys="vsys2", vsys_name=vsys_name
+        )
+        fw._xapi_private = mock.Mock()
+
+        fw.create_vsys()
+
+        fw.xapi.set.assert_called_once_with(
+            "/config/devices/entry[@name='localhost.localdomain']/vsys",
+            mock.ANY,
+            retry_on_peer=True,
+        )
+        return ET.fromstring(fw.xapi.set.call_args[0][1])
+
+    def test_create_vsys(self):
+        elm = self._create_vsys(None)
+
+        self.assertEqual("entry", elm.tag)
+        self.assertEqual("vsys2", elm.get("name"))
+        self.assertEqual(0, len(elm))
+
+    def test_create_vsys_with_display_name(self):
+        elm = self._create_vsys("R&D <lab>")
+
+        self.assertEqual("vsys2", elm.get("name"))
+        self.assertEqual("R&D <lab>", elm.findtext("display-name"))
+
+
+class TestFirewallCommit(unittest.TestCase):
+    def test_commit_with_firewall_commit_cmd(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret")
+        fw._xapi_private = mock.Mock()
+        fw.xapi.commit.return_value = ET.fromstring(
+            '<response status="success"><result><job>5</job></result></response>'
+        )
+        cmd = panos.firewall.FirewallCommit(
+            description="hi", exclude_policy_and_objects=True
+        )
+
+        ret_val = fw.commit(cmd=cmd)
+
+        self.assertEqual("5", ret_val)
+        self.assertEqual(
+            b"<commit><description>hi</description><partial>"
+            b"<policy-and-objects>excluded</policy-and-objects></partial></commit>",
+            fw.xapi.commit.call_args[1]["cmd"],
+        )
+
+
+class TestFirewallCommitMany(unittest.TestCase):
+    def _firewalls(self, jobs):
+        ans = []
+        for num, jobid in enumerate(jobs):
+            fw = panos.firewall.Firewall("fw{0}".format(num), api_key="secret")
+            fw._commit_submit = mock.Mock(return_value=jobid)
+            fw._check_job = mock.Mock(
+                return_value={
+                    "success": True,
+                    "jobid": jobid,
+                    "messages": [],
+                    "warnings": [],
+                }
+            )
+            ans.append(fw)
+        return ans
+
+    def test_submit_commit_device_and_network(self):
+        fw = self._firewalls(["1"])[0]
+
+        ret_val = fw.submit_commit_device_and_network()
+
+        self.assertEqual("1", ret_val)
+        fw._commit_submit.assert_called_once_with(
+            exclude="policy-and-objects", exception=False
+        )
+
+    def test_submit_commit_policy_and_objects(self):
+        fw = self._firewalls(["1"])[0]
+
+        ret_val = fw.submit_commit_policy_and_objects(exception=True)
+
+        self.assertEqual("1", ret_val)
+        fw._commit_submit.assert_called_once_with(
+            exclude="device-and-network", exception=True
+        )
+
+    def test_async_returns_job_ids(self):
+        fws = self._firewalls(["1", None, "3"])
+
+        ret_val = panos.firewall.Firewall.commit_many(fws, exclude="device-and-network")
+
+        self.assertEqual(["1", None, "3"], ret_val)
+        for fw in fws:
+            fw._commit_submit.assert_called_once_with(
+                exclude="device-and-network", exception=False
+            )
+            self.assertFalse(fw._check_job.called)
+
+    def test_commit_not_needed_does_not_stop_other_submits(self):
+        fws = self._firewalls(["1", None, "3"])
+
+        ret_val = panos.firewall.Firewall.commit_many(fws, exception=True)
+
+        self.assertEqual(["1", None, "3"], ret_val)
+        for fw in fws:
+            fw._commit_submit.assert_called_once_with(exclude=None, exception=False)
+
+    def test_submit_error_saves_started_jobs(self):
+        fws = self._firewalls(["1", None, "3", "4"])
+        fws[2]._commit_submit.side_effect = panos.errors.PanCommitInProgress(
+            "Commit in progress"
+        )
+
+        with self.assertRaises(panos.errors.PanCommitInProgress) as cm:
+            panos.firewall.Firewall.commit_many(fws, sync=True)
+
+        self.assertEqual([(fws[0], "1")], cm.exception.submitted)
+        self.assertFalse(fws[3]._commit_submit.called)
+        for fw in fws:
+            self.assertFalse(fw._check_job.called)
+
+    def test_async_failure_with_exception_returns_job_ids(self):
+        fws = self._firewalls(["1"])
+        fws[0]._check_job.return_value["success"] = False
+
+        ret_val = panos.firewall.Firewall.commit_many(fws, exception=True)
+
+        self.assertEqual(["1"], ret_val)
+        self.assertFalse(fws[0]._check_job.called)
+
+    def test_sync_starts_every_commit_before_waiting(self):
+        fws = self._firewalls(["1", None, "3"])
+        result = fws[0]._check_job.return_value
+
+        def check_job(jobid):
+            self.assertTrue(fws[2]._commit_submit.called)
+            return result
+
+        fws[0]._check_job.side_effect = check_job
+
+        ret_val = panos.firewall.Firewall.commit_many(fws, sync=True)
+
+        self.assertEqual([result, None, fws[2]._check_job.return_value], ret_val)
+        fws[0]._check_job.assert_called_once_with("1")
+        self.assertFalse(fws[1]._check_job.called)
+        fws[2]._check_job.assert_called_once_with("3")
+
+    def test_sync_failure_with_exception_raises_error(self):
+        fws = self._firewalls(["1"])
+        fws[0]._check_job.return_value["success"] = False
+
+        self.assertRaises(
+            panos.errors.PanCommitFailed,
+            panos.firewall.Firewall.commit_many,
+            fws,
+            sync=True,
+            exception=True,
+        )
+
+    @mock.patch("time.sleep")
+    def test_wait_commits_failure_waits_for_other_jobs(self, m_sleep):
+        fws = self._firewalls(["1", "2"])
+        fws[0]._check_job.return_value["success"] = False
+        fws[1]._check_job.side_effect = [None, fws[1]._check_job.return_value]
+
+        with self.assertRaises(panos.errors.PanCommitFailed) as cm:
+            panos.firewall.Firewall.wait_commits(
+                list(zip(fws, ["1", "2"])), exception=True
+            )
+
+        self.assertIs(fws[0], cm.exception.pan_device)
+        self.assertEqual(2, fws[1]._check_job.call_count)
+
+    @mock.patch("time.sleep")
+    def test_wait_commits_sleeps_once_per_round(self, m_sleep):
+        fws = self._firewalls(["1", "2"])
+        result1 = fws[0]._check_job.return_value
+        result2 = fws[1]._check_job.return_value
+        fws[0]._check_job.side_effect = [None, None, result1]
+        fws[1]._check_job.side_effect = [None, result2]
+
+        ret_val = panos.firewall.Firewall.wait_commits(
+            list(zip(fws, ["1", "2"])), interval=2
+        )
+
+        self.assertEqual([result1, result2], ret_val)
+        self.assertEqual(3, fws[0]._check_job.call_count)
+        self.assertEqual(2, fws[1]._check_job.call_count)
+        self.assertEqual([mock.call(2), mock.call(2)], m_sleep.call_args_list)
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time")
+    def test_wait_commits_unreachable_ignores_timeout(self, m_time, m_sleep):
+        fws = self._firewalls(["1"])
+        fws[0].timeout = 10
+        result = fws[0]._check_job.return_value
+        fws[0]._check_job.side_effect = [False, False, result]
+        m_time.side_effect = [0, 20, 30]
+
+        ret_val = panos.firewall.Firewall.wait_commits([(fws[0], "1")])
+
+        self.assertEqual([result], ret_val)
+        self.assertEqual(2, m_sleep.call_count)
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time")
+    def test_wait_commits_timeout_raises_error(self, m_time, m_sleep):
+        fws = self._firewalls(["1"])
+        fws[0].timeout = 10
+        fws[0]._check_job.return_value = None
+        m_time.side_effect = [0, 5, 11]
+
+        self.assertRaises(
+            pan.xapi.PanXapiError,
+            panos.firewall.Firewall.wait_commits,
+            [(fws[0], "1")],
+        )
+        self.assertEqual(1, m_sleep.call_count)
+
+
+class TestFirewallDeleteVsys(unittest.TestCase):
+    def test_delete_vsys(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret", vsys="vsys2")
+        fw._xapi_private = mock.Mock()
+
+        fw.delete_vsys()
+
+        fw.xapi.delete.assert_called_once_with(
+            "/config/devices/entry[@name='localhost.localdomain']"
+            "/vsys/entry[@name='vsys2']",
+            retry_on_peer=True,
+        )
+
+    def test_delete_vsys_for_shared_does_nothing(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret", vsys="shared")
+        fw._xapi_private = mock.Mock()
+
+        fw.delete_vsys()
+
+        self.assertFalse(fw.xapi.delete.called)
+
+    def test_delete_vsys_when_shared_does_nothing(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret", vsys="vsys2")
+        fw.shared = True
+        fw._xapi_private = mock.Mock()
+
+        fw.delete_vsys()
+
+        self.assertFalse(fw.xapi.delete.called)
+
+    def test_create_vsys_when_shared_does_nothing(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret", vsys="vsys2")
+        fw.shared = True
+        fw._xapi_private = mock.Mock()
+
+        fw.create_vsys()
+
+        self.assertFalse(fw.xapi.set.called)
+
+    def test_delete_vsys_after_vsys_set_on_ha_peer(self):
+        fw1 = panos.firewall.Firewall("fw1", api_key="secret", vsys="shared")
+        fw2 = panos.firewall.Firewall("fw2", api_key="secret", vsys="shared")
+        fw1.set_ha_peers(fw2)
+        fw2._xapi_private = mock.Mock()
+
+        fw1.vsys = "vsys3"
+        fw2.delete_vsys()
+
+        fw2.xapi.delete.assert_called_once_with(
+            "/config/devices/entry[@name='localhost.localdomain']"
+            "/vsys/entry[@name='vsys3']",
+            retry_on_peer=True,
+        )
+
+
+class TestShowSystemResources(unittest.TestCase):
+    PRE_9_0_OUTPUT = """<response status="success"><result><![CDATA[
+top - 10:00:00 up 10 days,  1:00,  0 users,  load average: 0.50, 0.40, 0.30
+Tasks: 120 total,   1 running, 119 sleeping,   0 stopped,   0 zombie
+Cpu(s):  2.5%us,  1.0%sy,  0.0%ni, 96.0%id,  0.5%wa,  0.0%hi,  0.0%si,  0.0%st
+Mem:   4048756k total,  3821232k used,   227524k free,   128564k buffers
+Swap:  2007992k total,   385548k used,  1622444k free,  1172908k cached
+]]></result></response>"""
+
+    POST_9_0_OUTPUT = """<response status="success"><result><![CDATA[
+top - 10:00:00 up 10 days,  1:00,  0 users,  load average: 0.50, 0.40, 0.30
+Tasks: 120 total,   1 running, 119 sleeping,   0 stopped,   0 zombie
+%Cpu(s):  2.5 us,  1.0 sy,  0.0 ni, 96.0 id,  0.5 wa,  0.0 hi,  0.0 si,  0.0 st
+KiB Mem : 4048756 total,   227524 free,  3821232 used,   128564 buff/cache
+KiB Swap: 2007992 total,  1622444 free,   385548 used.  1172908 avail Mem
+]]></result></response>"""
+
+    EXPECTED = {
+        "load": Decimal("0.50"),
+        "cpu": Decimal("4.0"),
+        "mem_total": 4048756,
+        "mem_free": 227524,
+    }
+
+    def _check(self, version, output):
+        fw = panos.firewall.Firewall("fw", api_key="secret")
+        fw._set_version_and_version_info(version)
+        fw._xapi_private = mock.Mock()
+        fw._xapi_private.xml_root.return_value = output
+
+        ret_val = fw.show_system_resources()
+
+        fw.xapi.op.assert_called_once_with(cmd="show system resources", cmd_xml=True)
+        self.assertEqual(self.EXPECTED, ret_val)
+
+    def test_pre_9_0(self):
+        self._check("8.1.0", self.PRE_9_0_OUTPUT)
+
+    def test_post_9_0(self):
+        self._check("9.0.0", self.POST_9_0_OUTPUT)
+
+    def test_post_9_0_padded_mem_line(self):
+        output = self.POST_9_0_OUTPUT.replace("KiB Mem : ", "KiB Mem :  ")
+        self._check("10.0.0", output)
+
+    def test_unparsable_output_raises_error(self):
+        fw = panos.firewall.Firewall("fw", api_key="secret")
+        fw._set_version_and_version_info("9.0.0")
+        fw._xapi_private = mock.Mock()
+        fw._xapi_private.xml_root.return_value = "<response/>"
+
+        self.assertRaises(panos.errors.PanDeviceError, fw.show_system_resources)
+
 
 if __name__ == "__main__":
     unittest.main()
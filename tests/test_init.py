@@ -144,5 +144,16 @@ class TestPanOSVersion(unittest.TestCase):
         self.assertTrue(self.h3 > self.m2)
 
 
+class TestConvertIfInt(unittest.TestCase):
+    def test_integer_string_is_converted(self):
+        self.assertEqual(1024, panos.convert_if_int("1024"))
+
+    def test_non_integer_string_is_unchanged(self):
+        self.assertEqual("layer3", panos.convert_if_int("layer3"))
+
+    def test_none_is_unchanged(self):
+        self.assertIsNone(panos.convert_if_int(None))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (c) 2014, Palo Alto Networks
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import unittest
+import xml.etree.ElementTree as ET
+
+import panos.firewall
+import panos.network
+
+
+class TestInterfaceGetCounters(unittest.TestCase):
+    ENTRY = (
+        "<entry><name>ethernet1/1</name><ibytes>1024</ibytes>"
+        "<obytes>2048</obytes><mode>layer3</mode></entry>"
+    )
+
+    EXPECTED = {
+        "name": "ethernet1/1",
+        "ibytes": 1024,
+        "obytes": 2048,
+        "mode": "layer3",
+    }
+
+    def _get_counters(self, result):
+        fw = panos.firewall.Firewall("fw", api_key="secret")
+        iface = panos.network.EthernetInterface("ethernet1/1")
+        fw.add(iface)
+        fw.op = mock.Mock(
+            return_value=ET.fromstring(
+                '<response status="success"><result>{0}</result></response>'.format(
+                    result
+                )
+            )
+        )
+
+        ret_val = iface.get_counters()
+
+        fw.op.assert_called_once_with('show counter interface "ethernet1/1"')
+        return ret_val
+
+    def test_ifnet_entry(self):
+        ret_val = self._get_counters(
+            "<ifnet>{0}</ifnet><hw>{0}</hw>".format(self.ENTRY)
+        )
+
+        self.assertEqual(self.EXPECTED, ret_val)
+
+    def test_nested_ifnet_entry(self):
+        ret_val = self._get_counters(
+            "<ifnet><ifnet>{0}<entry><name>other</name></entry></ifnet></ifnet>".format(
+                self.ENTRY
+            )
+        )
+
+        self.assertEqual(self.EXPECTED, ret_val)
+
+    def test_converts_yesno_and_nested_values(self):
+        ret_val = self._get_counters(
+            "<ifnet><entry><name>ethernet1/1</name><up>yes</up><ibytes>1</ibytes>"
+            "<empty/><sub><count>2</count><on>no</on></sub></entry></ifnet>"
+        )
+
+        self.assertEqual(
+            {
+                "name": "ethernet1/1",
+                "up": True,
+                "ibytes": 1,
+                "empty": None,
+                "sub": {"count": "2", "on": False},
+            },
+            ret_val,
+        )
+        self.assertIs(True, ret_val["up"])
+        self.assertIs(False, ret_val["sub"]["on"])
+
+    def test_not_configured_returns_none(self):
+        ret_val = self._get_counters("")
+
+        self.assertIsNone(ret_val)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,15 @@ class TestUserId(unittest.TestCase):
     a live device
     """
 
+    def test_userid_is_created_on_first_use(self):
+        fw = panos.firewall.Firewall("fw1", "user", "passwd", "authkey")
+
+        self.assertIsNone(fw._userid)
+        uid = fw.userid
+        self.assertIsInstance(uid, panos.userid.UserId)
+        self.assertIs(fw, uid.device)
+        self.assertIs(uid, fw.userid)
+
     def test_login(self):
         # Must set up different expectations for python 3.8 and higher
         # Per documentation: "Changed in version 3.8: The tostring()